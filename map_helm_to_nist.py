@@ -4,17 +4,50 @@ Reads HELM v0.4.0 schema.json and groups_metadata.json, downloads the NIST AI RM
 playbook, and produces a weighted many-to-many mapping from HELM metric groups to
 NIST RMF indicators based on topic-keyword alignment.
 
-Dependencies: stdlib only (json, urllib, pathlib, datetime, csv)
+Dependencies: stdlib only (json, urllib, pathlib, datetime, csv). Optional
+speedups are used when installed: orjson for JSON parsing and serialization,
+pyahocorasick for topic keyword matching, ijson for streaming the playbook
+download and runs.json.
 """
 
 import csv
+import functools
+import gzip
+import http.client
+import itertools
 import json
+import mmap
+import operator
+import os
+import pickle
+import re
 import urllib.request
 import urllib.error
 import ssl
+import sys
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future
 from pathlib import Path
 from datetime import datetime, timezone
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -24,6 +57,8 @@ HELM_DIR = PROJECT_DIR.parent / "helm_download" / "data" / "v0.4.0"
 
 NIST_PLAYBOOK_URL = "https://airc.nist.gov/docs/playbook.json"
 NIST_PLAYBOOK_PATH = DATA_DIR / "playbook.json"
+NIST_PLAYBOOK_PICKLE_PATH = DATA_DIR / "playbook.pkl"
+NIST_PLAYBOOK_HEADERS_PATH = DATA_DIR / "playbook.headers.json"
 OUTPUT_PATH = DATA_DIR / "helm_to_nist_mapping.json"
 CSV_OUTPUT_PATH = DATA_DIR / "helm_to_nist_mapping.csv"
 
@@ -106,48 +141,323 @@ WEIGHT_TIER_VALUES = {
     "low": 0.3,
 }
 
+# Parallel per-group tuples derived from HELM_TO_NIST_TOPIC_MAP and indexed by
+# group ordinal, so build_mapping reads each field without nested dict lookups.
+GROUP_NAMES = tuple(HELM_TO_NIST_TOPIC_MAP)
+GROUP_KEYWORDS = tuple(
+    frozenset(cfg["keywords"]) for cfg in HELM_TO_NIST_TOPIC_MAP.values()
+)
+GROUP_WEIGHT_TIERS = tuple(
+    cfg["weight_tier"] for cfg in HELM_TO_NIST_TOPIC_MAP.values()
+)
+GROUP_TIER_VALUES = tuple(WEIGHT_TIER_VALUES[tier] for tier in GROUP_WEIGHT_TIERS)
+
 
 def load_json(path: Path) -> dict | list:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # Both parsers take UTF-8 bytes directly, skipping a text-mode decode
+    return parse_json(path.read_bytes())
+
+
+def load_json_mapped(path: Path) -> dict | list:
+    """Load JSON from a memory-mapped file.
+
+    orjson parses straight out of the mapping, so the file contents are paged
+    in by the kernel instead of being copied into a bytes object first. The
+    stdlib parser needs real bytes, so without orjson this is load_json().
+    """
+    if orjson is None or path.stat().st_size == 0:
+        return load_json(path)
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        memoryview(mm) as view,
+    ):
+        return orjson.loads(view)
+
+
+class _CountingIterator:
+    """Iterator wrapper that counts the items drawn from it."""
+
+    def __init__(self, items: Iterable):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self) -> "_CountingIterator":
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        self.count += 1
+        return item
+
+
+def iter_json_array(path: Path) -> Iterator:
+    """Yield the items of the top-level JSON array stored at path.
+
+    With ijson installed the file is streamed so only one item is in memory
+    at a time; otherwise the whole array is loaded first via
+    load_json_mapped().
+    """
+    if ijson is None:
+        yield from load_json_mapped(path)
+        return
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path_str: str, mtime_ns: int) -> dict | list:
+    return load_json(Path(path_str))
+
+
+def load_json_cached(path: Path) -> dict | list:
+    """Load JSON from path, reusing the parsed result while the file is unchanged.
+
+    Keyed on the file's mtime so edits are picked up. The returned object is
+    shared between callers and must not be mutated.
+    """
+    return _load_json_cached(str(path), path.stat().st_mtime_ns)
+
+
+def parse_json(raw: bytes) -> dict | list:
+    """Parse JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def save_json(obj: dict | list, path: Path, indent: bool = True) -> None:
+    """Write obj to path as JSON, using orjson when available.
+
+    Output is 2-space indented for files people read; indent=False writes
+    compact JSON for caches only this script reads, which the stdlib can
+    encode with its C encoder.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else None
+        path.write_bytes(orjson.dumps(obj, option=option))
+        return
+    # json.dump() issues one write per encoded token; build the text first
+    if indent:
+        text = json.dumps(obj, indent=2)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+    path.write_text(text, encoding="utf-8")
+
+
+def _load_cached_playbook() -> list:
+    """Load the cached playbook, preferring the pickle sidecar when it is current.
+
+    The pickle is stamped with the mtime of playbook.json when written and is
+    only trusted while the two still match, so editing or replacing the JSON
+    invalidates it. A stale or unreadable pickle is rebuilt from the JSON
+    when data/ is writable.
+    """
+    pickle_path = NIST_PLAYBOOK_PICKLE_PATH
+    if (
+        pickle_path.exists()
+        and pickle_path.stat().st_mtime_ns == NIST_PLAYBOOK_PATH.stat().st_mtime_ns
+    ):
+        # Unpickling runs arbitrary code, so data/ must be trusted; any
+        # failure or unexpected result just falls back to the JSON
+        try:
+            with open(pickle_path, "rb") as f:
+                playbook = pickle.load(f)
+        except Exception:
+            playbook = None
+        if isinstance(playbook, list):
+            return playbook
+
+    playbook = load_json(NIST_PLAYBOOK_PATH)
+    try:
+        _save_playbook_pickle(playbook)
+    except OSError:
+        # The sidecar only speeds up later runs; a read-only data/ is fine
+        pass
+    return playbook
 
 
-def download_nist_playbook() -> list:
-    """Download the NIST AI RMF playbook JSON and cache it locally."""
-    if NIST_PLAYBOOK_PATH.exists():
-        print(f"  Using cached playbook at {NIST_PLAYBOOK_PATH}")
-        return load_json(NIST_PLAYBOOK_PATH)
+def _save_playbook_pickle(playbook: list) -> None:
+    """Write the pickle sidecar and stamp it with playbook.json's mtime."""
+    with open(NIST_PLAYBOOK_PICKLE_PATH, "wb") as f:
+        pickle.dump(playbook, f, protocol=pickle.HIGHEST_PROTOCOL)
+    json_stat = NIST_PLAYBOOK_PATH.stat()
+    os.utime(
+        NIST_PLAYBOOK_PICKLE_PATH,
+        ns=(json_stat.st_atime_ns, json_stat.st_mtime_ns),
+    )
+
 
-    print(f"  Downloading NIST AI RMF playbook from {NIST_PLAYBOOK_URL} ...")
+def _load_playbook_validators() -> dict:
+    """Return the ETag/Last-Modified headers saved with the cached playbook."""
+    if not NIST_PLAYBOOK_HEADERS_PATH.exists():
+        return {}
+    # Written after the playbook itself, so an interrupted run can leave it
+    # truncated; without validators the cache is simply used as is
+    try:
+        validators = load_json(NIST_PLAYBOOK_HEADERS_PATH)
+    except (OSError, ValueError):
+        return {}
+    return validators if isinstance(validators, dict) else {}
+
+
+def _open_url(req: urllib.request.Request):
+    """Open req and return the response.
+
+    HTTP error statuses (including 304 Not Modified) are raised as
+    urllib.error.HTTPError; only connection-level failures trigger the
+    unverified-certificate retry.
+    """
     # Create an SSL context that works in restrictive environments
     ctx = ssl.create_default_context()
-    req = urllib.request.Request(
-        NIST_PLAYBOOK_URL,
-        headers={"User-Agent": "helm-nist-mapper/1.0"},
-    )
     try:
-        with urllib.request.urlopen(req, context=ctx, timeout=30) as resp:
-            raw = resp.read()
-    except urllib.error.URLError as e:
+        return urllib.request.urlopen(req, context=ctx, timeout=30)
+    except urllib.error.HTTPError:
+        raise
+    except urllib.error.URLError:
         # Fallback: try without certificate verification for corporate proxies
         ctx = ssl._create_unverified_context()
-        with urllib.request.urlopen(req, context=ctx, timeout=30) as resp:
-            raw = resp.read()
+        return urllib.request.urlopen(req, context=ctx, timeout=30)
+
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Failures while reading, decompressing or parsing a response body
+_PLAYBOOK_READ_ERRORS = (
+    OSError, EOFError, ValueError, zlib.error, http.client.HTTPException,
+)
+if ijson is not None:
+    _PLAYBOOK_READ_ERRORS += (ijson.JSONError,)
+
+
+class _TeeReader:
+    """File-like wrapper that copies every chunk read from src into sink."""
+
+    def __init__(self, src, sink):
+        self.src = src
+        self.sink = sink
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.src.read(size)
+        self.sink.write(chunk)
+        return chunk
+
+
+def _stream_playbook(body) -> list:
+    """Parse the playbook while writing the raw bytes to the cache.
+
+    With ijson the response is parsed as it arrives; otherwise it is copied
+    in fixed-size chunks and parsed once complete. The bytes go to a
+    temporary file that replaces playbook.json only once the whole response
+    has been parsed, so a failed download never leaves a truncated cache
+    behind.
+    """
+    part_path = NIST_PLAYBOOK_PATH.with_suffix(".json.part")
+    try:
+        with open(part_path, "wb") as f:
+            if ijson is not None:
+                playbook = list(
+                    ijson.items(_TeeReader(body, f), "item", use_float=True)
+                )
+            else:
+                raw = bytearray()
+                while chunk := body.read(_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    raw += chunk
+                playbook = parse_json(raw)
+        part_path.replace(NIST_PLAYBOOK_PATH)
+    finally:
+        part_path.unlink(missing_ok=True)
+    return playbook
+
+
+def download_nist_playbook(emit: Callable[[str], None] = print) -> list:
+    """Download the NIST AI RMF playbook JSON and cache it locally.
+
+    When the cached copy was saved with ETag/Last-Modified validators, the
+    playbook is revalidated with a conditional GET and the cache is reused
+    on 304 Not Modified or any other HTTP error status, when the server
+    cannot be reached, or when the response cannot be read or parsed. Progress messages go to emit, so
+    callers running this off the main thread can collect them and print
+    them in order later.
+    """
+    cached = NIST_PLAYBOOK_PATH.exists()
+    validators = _load_playbook_validators() if cached else {}
+    if cached and not validators:
+        emit(f"  Using cached playbook at {NIST_PLAYBOOK_PATH}")
+        return _load_cached_playbook()
+
+    headers = {"User-Agent": "helm-nist-mapper/1.0", "Accept-Encoding": "gzip"}
+    if validators.get("ETag"):
+        headers["If-None-Match"] = validators["ETag"]
+    if validators.get("Last-Modified"):
+        headers["If-Modified-Since"] = validators["Last-Modified"]
+    req = urllib.request.Request(NIST_PLAYBOOK_URL, headers=headers)
+
+    if cached:
+        emit(f"  Checking {NIST_PLAYBOOK_URL} for playbook updates ...")
+    else:
+        emit(f"  Downloading NIST AI RMF playbook from {NIST_PLAYBOOK_URL} ...")
+    try:
+        resp = _open_url(req)
+    except urllib.error.HTTPError as e:
+        if not cached:
+            raise
+        if e.code == 304:
+            emit(f"  Playbook not modified, using cached playbook at {NIST_PLAYBOOK_PATH}")
+        else:
+            emit(f"  NIST returned HTTP {e.code}, using cached playbook at {NIST_PLAYBOOK_PATH}")
+        return _load_cached_playbook()
+    except (OSError, http.client.HTTPException) as e:
+        # urlopen() only wraps connection errors in URLError; failures while
+        # reading the status line (RemoteDisconnected, timeouts) pass through
+        if not cached:
+            raise
+        reason = getattr(e, "reason", None) or str(e) or type(e).__name__
+        emit(f"  Could not reach NIST ({reason}), using cached playbook at {NIST_PLAYBOOK_PATH}")
+        return _load_cached_playbook()
 
-    playbook = json.loads(raw)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with open(NIST_PLAYBOOK_PATH, "w", encoding="utf-8") as f:
-        json.dump(playbook, f, indent=2)
-    print(f"  Saved playbook ({len(playbook)} entries) to {NIST_PLAYBOOK_PATH}")
+    with resp:
+        resp_headers = resp.headers
+        body = resp
+        if resp_headers.get("Content-Encoding", "").lower() == "gzip":
+            body = gzip.GzipFile(fileobj=resp)
+        try:
+            playbook = _stream_playbook(body)
+        except _PLAYBOOK_READ_ERRORS as e:
+            if not cached:
+                raise
+            # The .part file is discarded, so playbook.json is untouched
+            reason = str(e).partition("\n")[0] or type(e).__name__
+            emit(
+                f"  Could not read playbook from NIST ({reason}), "
+                f"using cached playbook at {NIST_PLAYBOOK_PATH}"
+            )
+            return _load_cached_playbook()
+    _save_playbook_pickle(playbook)
+    save_json(
+        {
+            name: resp_headers.get(name)
+            for name in ("ETag", "Last-Modified")
+            if resp_headers.get(name)
+        },
+        NIST_PLAYBOOK_HEADERS_PATH,
+        indent=False,
+    )
+    emit(f"  Saved playbook ({len(playbook)} entries) to {NIST_PLAYBOOK_PATH}")
     return playbook
 
 
+_get_name = operator.itemgetter("name")
+
+
 def extract_helm_metric_groups(schema: dict) -> dict:
     """Extract metric groups from HELM schema.json into {name: {display_name, metrics[]}}."""
     groups = {}
     for mg in schema.get("metric_groups", []):
         name = mg["name"]
-        metrics = [m["name"] for m in mg.get("metrics", [])]
+        metrics = list(map(_get_name, mg.get("metrics", ())))
         groups[name] = {
             "display_name": mg.get("display_name", name),
             "description": mg.get("description", ""),
@@ -157,27 +467,140 @@ def extract_helm_metric_groups(schema: dict) -> dict:
     return groups
 
 
-def match_nist_indicators(playbook: list, keywords: list[str]) -> list[dict]:
-    """Find NIST playbook entries whose Topic[] contains any of the given keywords."""
+def _entry_topics(entry: dict) -> list[str]:
+    """Return a playbook entry's Topic[] as a list."""
+    topics = entry.get("Topic", [])
+    # Handle case where Topic might be a string instead of list
+    if isinstance(topics, str):
+        topics = [topics]
+    return topics
+
+
+def match_playbook_entries(
+    playbook: list,
+    group_keywords: dict[str, Iterable[str]],
+) -> dict[str, list[int]]:
+    """Return {group: [entry_idx, ...]} of entries whose Topic[] contains any keyword.
+
+    Keywords match as case-insensitive substrings and indices are in playbook
+    order. Groups with the same keyword set share one list; do not mutate it.
+    """
+    group_keyword_sets = {
+        group: frozenset(kw.lower() for kw in keywords)
+        for group, keywords in group_keywords.items()
+    }
+    # One bit per distinct keyword set; each keyword maps to the bitmask of
+    # the sets that contain it
+    keyword_sets = list(dict.fromkeys(group_keyword_sets.values()))
+    keyword_masks: dict[str, int] = {}
+    for bit, keyword_set in enumerate(keyword_sets):
+        for kw_lower in keyword_set:
+            keyword_masks[kw_lower] = keyword_masks.get(kw_lower, 0) | 1 << bit
+
+    # Topics that are not a keyword label are scanned for substrings: in one
+    # pass for all keywords with pyahocorasick, else behind a regex prefilter
+    automaton = None
+    if ahocorasick is not None and keyword_masks:
+        automaton = ahocorasick.Automaton()
+        for kw_lower, mask in keyword_masks.items():
+            automaton.add_word(kw_lower, mask)
+        automaton.make_automaton()
+    else:
+        any_keyword = re.compile(
+            "|".join(map(re.escape, keyword_masks)), re.IGNORECASE
+        )
+
+    # Mask for a topic that *is* a keyword label: the label itself plus any
+    # other keyword nested inside it
+    label_masks: dict[str, int] = {}
+    for kw_lower in keyword_masks:
+        label_masks[kw_lower] = 0
+        for other, mask in keyword_masks.items():
+            if other in kw_lower:
+                label_masks[kw_lower] |= mask
+
+    # Invert the playbook into {topic.lower(): [entry_idx, ...]} so each
+    # distinct topic is checked once; playbooks repeat the same few labels,
+    # so lowercase each raw string once too
+    lowered: dict[str, str] = {}
+    topic_entries: dict[str, list[int]] = {}
+    for i, entry in enumerate(playbook):
+        for t in _entry_topics(entry):
+            t_lower = lowered.get(t)
+            if t_lower is None:
+                t_lower = lowered[t] = t.lower()
+            indices = topic_entries.setdefault(t_lower, [])
+            if not indices or indices[-1] != i:
+                indices.append(i)
+
+    # OR each topic's keyword-set bits into every entry listing it
+    entry_masks = [0] * len(playbook)
+    for t_lower, indices in topic_entries.items():
+        if t_lower in label_masks:
+            mask = label_masks[t_lower]
+        elif automaton is not None:
+            mask = 0
+            for _, kw_mask in automaton.iter(t_lower):
+                mask |= kw_mask
+        elif any_keyword.search(t_lower):
+            # IGNORECASE matches a superset of lower() + substring, so the
+            # exact checks still decide which keywords hit
+            mask = 0
+            for kw_lower, kw_mask in keyword_masks.items():
+                if kw_lower in t_lower:
+                    mask |= kw_mask
+        else:
+            continue
+        if mask:
+            for i in indices:
+                entry_masks[i] |= mask
+
+    set_matches = {
+        keyword_set: [i for i, mask in enumerate(entry_masks) if mask >> bit & 1]
+        for bit, keyword_set in enumerate(keyword_sets)
+    }
+    return {
+        group: set_matches[keyword_set]
+        for group, keyword_set in group_keyword_sets.items()
+    }
+
+
+def project_indicator(entry: dict) -> dict:
+    """Project a playbook entry onto the fields emitted for a NIST indicator."""
+    return {
+        "title": entry.get("title", ""),
+        "type": entry.get("type", ""),
+        "nist_type": entry.get("type", "").upper(),
+        "category": entry.get("category", ""),
+        "description": entry.get("description", ""),
+        "topics": _entry_topics(entry),
+    }
+
+
+def match_nist_indicators(
+    playbook: list,
+    keywords: Iterable[str],
+    entry_indices: list[int] | None = None,
+    indicators: dict[int, dict] | None = None,
+) -> list[dict]:
+    """Find NIST playbook entries whose Topic[] contains any of the given keywords.
+
+    entry_indices, taken from match_playbook_entries(), skips the playbook
+    scan when the matches have already been computed. indicators memoizes
+    project_indicator() by playbook index: entries are projected the first
+    time they match and returned by reference after that, so callers sharing
+    it must copy before mutating.
+    """
+    if entry_indices is None:
+        entry_indices = match_playbook_entries(playbook, {"": keywords})[""]
+    if indicators is None:
+        return [project_indicator(playbook[i]) for i in entry_indices]
     matched = []
-    for entry in playbook:
-        topics = entry.get("Topic", [])
-        # Handle case where Topic might be a string instead of list
-        if isinstance(topics, str):
-            topics = [topics]
-        # Check if any keyword appears as a substring in any topic
-        for kw in keywords:
-            kw_lower = kw.lower()
-            if any(kw_lower in t.lower() for t in topics):
-                matched.append({
-                    "title": entry.get("title", ""),
-                    "type": entry.get("type", ""),
-                    "nist_type": entry.get("type", "").upper(),
-                    "category": entry.get("category", ""),
-                    "description": entry.get("description", ""),
-                    "topics": topics,
-                })
-                break  # avoid duplicate entries for the same playbook item
+    for i in entry_indices:
+        indicator = indicators.get(i)
+        if indicator is None:
+            indicator = indicators[i] = project_indicator(playbook[i])
+        matched.append(indicator)
     return matched
 
 
@@ -188,44 +611,41 @@ def build_mapping(
     """Build the HELM -> NIST mapping with computed weights."""
     from collections import defaultdict
 
-    mappings = []
-    for group_name, topic_config in HELM_TO_NIST_TOPIC_MAP.items():
+    group_entries = match_playbook_entries(
+        playbook, dict(zip(GROUP_NAMES, GROUP_KEYWORDS))
+    )
+    # Projected on first match and shared across groups; each group gets
+    # its own weighted copies
+    indicators: dict[int, dict] = {}
+
+    # Match every group and compute type_weight: rolled-up total of
+    # mapping_weight per NIST type across all categories
+    matched_groups = []
+    matched_by_keywords: dict[frozenset[str], list[dict]] = {}
+    type_weight_totals: dict[str, float] = defaultdict(float)
+    for group_name, keywords, weight_tier, tier_value in zip(
+        GROUP_NAMES, GROUP_KEYWORDS, GROUP_WEIGHT_TIERS, GROUP_TIER_VALUES
+    ):
         if group_name not in helm_groups:
             continue
 
-        helm_info = helm_groups[group_name]
-        keywords = topic_config["keywords"]
-        weight_tier = topic_config["weight_tier"]
-        tier_value = WEIGHT_TIER_VALUES[weight_tier]
-
-        nist_indicators = match_nist_indicators(playbook, keywords)
+        # Groups with the same keyword set share one (read-only) match list
+        matched = matched_by_keywords.get(keywords)
+        if matched is None:
+            matched = matched_by_keywords[keywords] = match_nist_indicators(
+                playbook, keywords, group_entries[group_name], indicators
+            )
 
         # Compute per-indicator weight:
         # category_weight * (1 / num_matched_indicators) to normalize
-        num_indicators = len(nist_indicators) if nist_indicators else 1
+        num_indicators = len(matched) if matched else 1
         per_indicator_weight = round(tier_value / num_indicators, 4)
 
-        for indicator in nist_indicators:
-            indicator["mapping_weight"] = per_indicator_weight
-
-        mappings.append({
-            "helm_category": group_name,
-            "helm_display_name": helm_info["display_name"],
-            "helm_metrics": helm_info["metrics"],
-            "helm_metric_count": helm_info["metric_count"],
-            "weight_tier": weight_tier,
-            "nist_indicators": nist_indicators,
-        })
+        for indicator in matched:
+            type_weight_totals[indicator["nist_type"]] += per_indicator_weight
+        matched_groups.append((group_name, weight_tier, matched, per_indicator_weight))
 
-    # Compute type_weight: rolled-up total of mapping_weight per NIST type
-    # across all categories
-    type_weight_totals: dict[str, float] = defaultdict(float)
-    for m in mappings:
-        for indicator in m["nist_indicators"]:
-            nist_type = indicator["nist_type"]
-            type_weight_totals[nist_type] += indicator["mapping_weight"]
-
-    # Convert to percentages and attach to each indicator
+    # Convert to percentages
     grand_total = sum(type_weight_totals.values())
     if grand_total > 0:
         type_weights = {
@@ -234,9 +654,26 @@ def build_mapping(
         }
     else:
         type_weights = {t: "0.0%" for t in type_weight_totals}
-    for m in mappings:
-        for indicator in m["nist_indicators"]:
-            indicator["type_weight"] = type_weights[indicator["nist_type"]]
+
+    # Emit per-group copies of the shared indicators with both weights set
+    mappings = []
+    for group_name, weight_tier, matched, per_indicator_weight in matched_groups:
+        helm_info = helm_groups[group_name]
+        mappings.append({
+            "helm_category": group_name,
+            "helm_display_name": helm_info["display_name"],
+            "helm_metrics": helm_info["metrics"],
+            "helm_metric_count": helm_info["metric_count"],
+            "weight_tier": weight_tier,
+            "nist_indicators": [
+                {
+                    **indicator,
+                    "mapping_weight": per_indicator_weight,
+                    "type_weight": type_weights[indicator["nist_type"]],
+                }
+                for indicator in matched
+            ],
+        })
 
     return mappings, type_weights
 
@@ -267,62 +704,84 @@ HELM_GROUP_STAT_KEYS = {
 }
 
 
-def _stat_matches_group(stat_name: str, perturbation: str, keys: dict) -> bool:
-    """Check if a stat entry matches a HELM group's stat key definition."""
-    expected_name = keys.get("name")
-    expected_pert = keys.get("perturbation_name", "")
-    match_mode = keys.get("match", "exact")
+def _index_group_stat_keys(
+    stat_keys: dict[str, dict],
+) -> tuple[dict[str, tuple[str, ...]], dict[str, tuple[str, ...]], tuple[tuple[str, str], ...]]:
+    """Invert HELM_GROUP_STAT_KEYS into lookup tables keyed by what a stat carries.
 
-    if expected_pert:
-        return perturbation == expected_pert
-    if not expected_name:
-        return False
+    Returns:
+        by_perturbation: perturbation name -> groups matching any stat with it
+        by_stat_name: stat name -> groups matching it exactly (no perturbation)
+        by_prefix: (prefix, group) pairs matching stat names by prefix
+    """
+    by_perturbation: dict[str, tuple[str, ...]] = {}
+    by_stat_name: dict[str, tuple[str, ...]] = {}
+    by_prefix: list[tuple[str, str]] = []
+    for group, keys in stat_keys.items():
+        expected_name = keys.get("name")
+        expected_pert = keys.get("perturbation_name", "")
+        if expected_pert:
+            by_perturbation[expected_pert] = by_perturbation.get(expected_pert, ()) + (group,)
+        elif not expected_name:
+            continue
+        elif keys.get("match", "exact") == "prefix":
+            by_prefix.append((expected_name, group))
+        else:
+            by_stat_name[expected_name] = by_stat_name.get(expected_name, ()) + (group,)
+    return by_perturbation, by_stat_name, tuple(by_prefix)
+
+
+PERTURBATION_GROUPS, STAT_NAME_GROUPS, STAT_PREFIX_GROUPS = _index_group_stat_keys(
+    HELM_GROUP_STAT_KEYS
+)
+
+
+def _stat_groups(stat_name: str, perturbation: str) -> tuple[str, ...]:
+    """Return the HELM groups a stat entry counts towards."""
     if perturbation:
-        return False
-    if match_mode == "prefix":
-        return stat_name.startswith(expected_name)
-    return stat_name == expected_name
+        return PERTURBATION_GROUPS.get(perturbation, ())
+    groups = STAT_NAME_GROUPS.get(stat_name, ())
+    for prefix, group in STAT_PREFIX_GROUPS:
+        if stat_name.startswith(prefix):
+            groups += (group,)
+    return groups
 
 
-def compute_per_model_signal_status(runs: list) -> tuple[dict[tuple[str, str], str], list[str]]:
+def compute_per_model_signal_status(runs: Iterable[dict]) -> tuple[dict[tuple[str, str], str], list[str]]:
     """Determine pass/fail status per (model, HELM metric group) from runs.json.
 
+    runs is consumed once, so it may be a stream such as iter_json_array().
+
     Returns:
         status: dict mapping (model_name, group_name) -> "passed" | "failed"
         models: sorted list of unique model names
     """
-    from collections import defaultdict
-
-    # (model, group) -> {success: int, total: int}
-    success_counts: dict[tuple[str, str], int] = defaultdict(int)
-    total_counts: dict[tuple[str, str], int] = defaultdict(int)
+    # A (model, group) passes once any of its stats has a non-zero count,
+    # so only those keys are recorded and stats with no results are skipped
+    passed: set[tuple[str, str]] = set()
     all_models: set[str] = set()
 
+    add_model = all_models.add
+    add_passed = passed.add
     for run in runs:
         model = run["run_spec"]["adapter_spec"]["model"]
-        all_models.add(model)
+        add_model(model)
 
-        for stat in run.get("stats", []):
-            stat_name = stat["name"]["name"]
-            perturbation = stat["name"].get("perturbation_name", "")
+        for stat in run.get("stats", ()):
             count = stat.get("count", 0)
+            if not count > 0:
+                continue
+            name = stat["name"]
+            perturbation = name.get("perturbation_name") or ""
 
-            for group, keys in HELM_GROUP_STAT_KEYS.items():
-                if _stat_matches_group(stat_name, perturbation, keys):
-                    key = (model, group)
-                    total_counts[key] += 1
-                    if count > 0:
-                        success_counts[key] += 1
+            for group in _stat_groups(name["name"], perturbation):
+                add_passed((model, group))
 
+    # Every (model, group) fails unless it had a stat with a non-zero count
     models = sorted(all_models)
-    status = {}
-    for model in models:
-        for group in HELM_GROUP_STAT_KEYS:
-            key = (model, group)
-            if total_counts[key] == 0 or success_counts[key] == 0:
-                status[key] = "failed"
-            else:
-                status[key] = "passed"
+    status = dict.fromkeys(itertools.product(models, HELM_GROUP_STAT_KEYS), "failed")
+    for key in passed:
+        status[key] = "passed"
 
     return status, models
 
@@ -360,19 +819,17 @@ def _compute_per_model_type_weights(
     """Compute rolled-up type weight per (model, NIST type).
 
     For each model, sums the mapping_weight of all passed indicators grouped
-    by NIST type (GOVERN, MAP, MEASURE, MANAGE).
+    by NIST type (GOVERN, MAP, MEASURE, MANAGE). Models that passed exactly
+    the same categories get the same weights, so each distinct pass/fail
+    pattern is summed once.
     """
     from collections import defaultdict
 
-    totals: dict[tuple[str, str], float] = defaultdict(float)
-    for model in models:
-        for m in mappings:
-            is_failed = signal_status.get((model, m["helm_category"])) == "failed"
-            if is_failed:
-                continue
-            for indicator in m["nist_indicators"]:
-                nist_type = indicator["nist_type"]
-                totals[(model, nist_type)] += indicator["mapping_weight"]
+    # (nist_type, mapping_weight) per indicator, flattened once per mapping
+    mapping_type_weights = [
+        [(ind["nist_type"], ind["mapping_weight"]) for ind in m["nist_indicators"]]
+        for m in mappings
+    ]
 
     # Convert to percentages using total possible weight as denominator
     # so that failed categories reduce the percentage
@@ -380,9 +837,27 @@ def _compute_per_model_type_weights(
         WEIGHT_TIER_VALUES[m["weight_tier"]] for m in mappings
     )
 
+    pattern_weights: dict[tuple[bool, ...], dict[str, float]] = {}
     result = {}
-    for (model, nist_type), val in totals.items():
-        result[(model, nist_type)] = round((val / grand_total) * 100, 1) if grand_total > 0 else 0.0
+    for model in models:
+        passed = tuple(
+            signal_status.get((model, m["helm_category"])) != "failed"
+            for m in mappings
+        )
+        type_weights = pattern_weights.get(passed)
+        if type_weights is None:
+            totals: dict[str, float] = defaultdict(float)
+            for is_passed, weights in zip(passed, mapping_type_weights):
+                if not is_passed:
+                    continue
+                for nist_type, weight in weights:
+                    totals[nist_type] += weight
+            type_weights = pattern_weights[passed] = {
+                nist_type: round((val / grand_total) * 100, 1) if grand_total > 0 else 0.0
+                for nist_type, val in totals.items()
+            }
+        for nist_type, pct in type_weights.items():
+            result[(model, nist_type)] = pct
     return result
 
 
@@ -409,32 +884,24 @@ def write_csv(
         mappings, signal_status, models
     )
 
-    rows = []
-    for model in models:
-        for m in mappings:
-            category = m["helm_display_name"]
-            tier_value = WEIGHT_TIER_VALUES[m["weight_tier"]]
-            weight_pct = f"{(tier_value / total_weight) * 100:.1f}%"
-            helm_signal = HELM_SIGNAL_LABELS.get(
-                m["helm_category"], m["helm_display_name"]
-            )
-            is_failed = signal_status.get((model, m["helm_category"])) == "failed"
-
-            if is_failed or not m["nist_indicators"]:
-                rows.append([
-                    model, category, weight_pct, helm_signal,
-                    "Do Not Use", "", "",
-                ])
-                continue
-
-            for indicator in m["nist_indicators"]:
-                nist_type = indicator["nist_type"]
-                type_wt = model_type_weights.get((model, nist_type), 0.0)
-                type_wt_pct = f"{type_wt}%"
-                rows.append([
-                    model, category, weight_pct, helm_signal,
-                    indicator["title"].upper(), nist_type, type_wt_pct,
-                ])
+    # Columns that depend only on the mapping, computed once rather than
+    # once per model: the category prefix and each indicator's (title, type)
+    mapping_prefixes = []
+    mapping_indicators = []
+    for m in mappings:
+        tier_value = WEIGHT_TIER_VALUES[m["weight_tier"]]
+        mapping_prefixes.append((
+            m["helm_display_name"],
+            f"{(tier_value / total_weight) * 100:.1f}%",
+            HELM_SIGNAL_LABELS.get(m["helm_category"], m["helm_display_name"]),
+        ))
+        mapping_indicators.append(tuple(
+            (indicator["title"].upper(), indicator["nist_type"])
+            for indicator in m["nist_indicators"]
+        ))
+    nist_types = {
+        nist_type for indicators in mapping_indicators for _, nist_type in indicators
+    }
 
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     with open(CSV_OUTPUT_PATH, "w", newline="", encoding="utf-8") as f:
@@ -443,107 +910,193 @@ def write_csv(
             "Model", "Category", "weight", "stanford HELM signal",
             "NIST AI RMF", "type", "type_weight",
         ])
-        writer.writerows(rows)
+        for model in models:
+            type_wt_pcts = {
+                nist_type: f"{model_type_weights.get((model, nist_type), 0.0)}%"
+                for nist_type in nist_types
+            }
+            for m, (category, weight_pct, helm_signal), indicators in zip(
+                mappings, mapping_prefixes, mapping_indicators
+            ):
+                is_failed = signal_status.get((model, m["helm_category"])) == "failed"
+
+                if is_failed or not indicators:
+                    writer.writerow([
+                        model, category, weight_pct, helm_signal,
+                        "Do Not Use", "", "",
+                    ])
+                    continue
+
+                for title, nist_type in indicators:
+                    writer.writerow([
+                        model, category, weight_pct, helm_signal,
+                        title, nist_type, type_wt_pcts[nist_type],
+                    ])
+
+
+_SUMMARY_ROW = "%-30s %-8s %-10s %-35s"
 
 
 def print_summary(mappings: list[dict]) -> None:
-    """Print a summary table of the mapping."""
-    print("\n" + "=" * 90)
-    print(f"{'HELM Category':<30} {'Tier':<8} {'NIST Indicators':<10} {'Top NIST Match':<35}")
-    print("-" * 90)
+    """Print a summary table of the mapping.
+
+    The table is assembled in memory and written to stdout in one call.
+    """
+    lines = [
+        "\n" + "=" * 90,
+        _SUMMARY_ROW % ("HELM Category", "Tier", "NIST Indicators", "Top NIST Match"),
+        "-" * 90,
+    ]
+    total_pairs = 0
     for m in mappings:
-        top_match = m["nist_indicators"][0]["title"] if m["nist_indicators"] else "(none)"
-        print(
-            f"{m['helm_display_name']:<30} "
-            f"{m['weight_tier']:<8} "
-            f"{len(m['nist_indicators']):<10} "
-            f"{top_match:<35}"
-        )
-    print("=" * 90)
+        num_indicators = len(m["nist_indicators"])
+        total_pairs += num_indicators
+        top_match = m["nist_indicators"][0]["title"] if num_indicators else "(none)"
+        lines.append(_SUMMARY_ROW % (
+            m["helm_display_name"], m["weight_tier"], num_indicators, top_match,
+        ))
+    lines.append("=" * 90)
+
+    lines.append(f"\nTotal HELM categories mapped: {len(mappings)}")
+    lines.append(f"Total HELM->NIST pairs:       {total_pairs}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
-    total_pairs = sum(len(m["nist_indicators"]) for m in mappings)
-    print(f"\nTotal HELM categories mapped: {len(mappings)}")
-    print(f"Total HELM->NIST pairs:       {total_pairs}")
+
+def _run_in_background(fn: Callable, *args) -> Future:
+    """Run fn(*args) on a daemon thread and return a Future for its result.
+
+    Unlike a ThreadPoolExecutor worker, the thread is not joined at exit, so
+    an error elsewhere or Ctrl-C ends the run without waiting for fn.
+    """
+    future: Future = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+_log_buf: list[str] = []
+
+
+def log(msg: str) -> None:
+    """Queue a progress message; flush_log() writes the queue to stdout."""
+    _log_buf.append(msg)
+
+
+def flush_log() -> None:
+    """Write the queued progress messages to stdout in one call."""
+    if _log_buf:
+        sys.stdout.write("\n".join(_log_buf) + "\n")
+        _log_buf.clear()
 
 
 def main() -> None:
-    print("=== HELM -> NIST AI RMF Mapping ===\n")
-
-    # Step 1: Load HELM data
-    print("[1/5] Loading HELM schema and groups metadata...")
-    schema_path = HELM_DIR / "schema.json"
-    if not schema_path.exists():
-        raise FileNotFoundError(f"HELM schema not found at {schema_path}")
-    schema = load_json(schema_path)
-    helm_groups = extract_helm_metric_groups(schema)
-    print(f"  Found {len(helm_groups)} metric groups in schema.json")
-
-    groups_meta_path = HELM_DIR / "groups_metadata.json"
-    if groups_meta_path.exists():
-        groups_meta = load_json(groups_meta_path)
-        print(f"  Found {len(groups_meta)} entries in groups_metadata.json")
-    else:
-        groups_meta = {}
-        print("  groups_metadata.json not found, continuing without it")
-
-    # Step 2: Download NIST playbook
-    print("\n[2/5] Fetching NIST AI RMF playbook...")
-    playbook = download_nist_playbook()
-    print(f"  Playbook has {len(playbook)} entries")
-
-    # Step 3: Load HELM runs for per-model signal status
-    print("\n[3/7] Loading HELM runs for per-model signal status...")
-    runs_path = HELM_DIR / "runs.json"
-    if runs_path.exists():
-        runs = load_json(runs_path)
-        print(f"  Loaded {len(runs)} runs from runs.json")
-        signal_status, models = compute_per_model_signal_status(runs)
-        print(f"  Found {len(models)} models")
-        passed = sum(1 for s in signal_status.values() if s == "passed")
-        failed = sum(1 for s in signal_status.values() if s == "failed")
-        print(f"  Per-model signal status: {passed} passed, {failed} failed")
-    else:
-        runs = []
-        signal_status = {}
-        models = []
-        print("  runs.json not found, assuming all signals passed")
-
-    # Step 4: Build mapping
-    print("\n[4/7] Matching HELM metric groups to NIST indicators via topic keywords...")
-    mappings, type_weights = build_mapping(helm_groups, playbook)
-    print(f"  Produced {len(mappings)} category mappings")
-    print(f"  Type weights: {type_weights}")
-
-    # Step 5: Save JSON output
-    print("\n[5/7] Saving JSON mapping to disk...")
-    output = {
-        "metadata": {
-            "helm_version": "v0.4.0",
-            "nist_source": NIST_PLAYBOOK_URL,
-            "generated": datetime.now(timezone.utc).isoformat(),
-            "description": (
-                "Mapping from HELM Classic benchmark metric categories "
-                "to NIST AI RMF playbook indicators, weighted by category "
-                "importance and normalized by match count."
-            ),
-        },
-        "type_weights": type_weights,
-        "mappings": mappings,
-    }
+    try:
+        log("=== HELM -> NIST AI RMF Mapping ===\n")
+
+        schema_path = HELM_DIR / "schema.json"
+        if not schema_path.exists():
+            raise FileNotFoundError(f"HELM schema not found at {schema_path}")
+
+        # The playbook fetch is network-bound on a cold cache; run it in the
+        # background while the local HELM files are parsed, and print its
+        # messages once step 2 is reached
+        playbook_log: list[str] = []
+        playbook_future = _run_in_background(
+            download_nist_playbook, playbook_log.append
+        )
 
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2)
-    print(f"  Saved to {OUTPUT_PATH}")
-
-    # Step 6: Save CSV output
-    print("\n[6/7] Saving CSV mapping to disk...")
-    write_csv(mappings, signal_status, models)
-    print(f"  Saved to {CSV_OUTPUT_PATH}")
-
-    # Step 7: Print summary
-    print("\n[7/7] Summary")
-    print_summary(mappings)
+        # Step 1: Load HELM data
+        log("[1/5] Loading HELM schema and groups metadata...")
+        schema = load_json_cached(schema_path)
+        helm_groups = extract_helm_metric_groups(schema)
+        log(f"  Found {len(helm_groups)} metric groups in schema.json")
+
+        groups_meta_path = HELM_DIR / "groups_metadata.json"
+        if groups_meta_path.exists():
+            groups_meta = load_json_cached(groups_meta_path)
+            log(f"  Found {len(groups_meta)} entries in groups_metadata.json")
+        else:
+            groups_meta = {}
+            log("  groups_metadata.json not found, continuing without it")
+        flush_log()
+
+        # Step 2: Download NIST playbook
+        log("\n[2/5] Fetching NIST AI RMF playbook...")
+        try:
+            playbook = playbook_future.result()
+        finally:
+            _log_buf.extend(playbook_log)
+        log(f"  Playbook has {len(playbook)} entries")
+        flush_log()
+
+        # Step 3: Load HELM runs for per-model signal status
+        log("\n[3/7] Loading HELM runs for per-model signal status...")
+        runs_path = HELM_DIR / "runs.json"
+        if runs_path.exists():
+            # Stream runs straight into the status computation
+            runs = _CountingIterator(iter_json_array(runs_path))
+            signal_status, models = compute_per_model_signal_status(runs)
+            log(f"  Loaded {runs.count} runs from runs.json")
+            log(f"  Found {len(models)} models")
+            status_counts = Counter(signal_status.values())
+            log(
+                f"  Per-model signal status: {status_counts['passed']} passed, "
+                f"{status_counts['failed']} failed"
+            )
+        else:
+            signal_status = {}
+            models = []
+            log("  runs.json not found, assuming all signals passed")
+        flush_log()
+
+        # Step 4: Build mapping
+        log("\n[4/7] Matching HELM metric groups to NIST indicators via topic keywords...")
+        mappings, type_weights = build_mapping(helm_groups, playbook)
+        log(f"  Produced {len(mappings)} category mappings")
+        log(f"  Type weights: {type_weights}")
+        flush_log()
+
+        # Step 5: Save JSON output
+        log("\n[5/7] Saving JSON mapping to disk...")
+        output = {
+            "metadata": {
+                "helm_version": "v0.4.0",
+                "nist_source": NIST_PLAYBOOK_URL,
+                "generated": datetime.now(timezone.utc).isoformat(),
+                "description": (
+                    "Mapping from HELM Classic benchmark metric categories "
+                    "to NIST AI RMF playbook indicators, weighted by category "
+                    "importance and normalized by match count."
+                ),
+            },
+            "type_weights": type_weights,
+            "mappings": mappings,
+        }
+
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        save_json(output, OUTPUT_PATH)
+        log(f"  Saved to {OUTPUT_PATH}")
+        flush_log()
+
+        # Step 6: Save CSV output
+        log("\n[6/7] Saving CSV mapping to disk...")
+        write_csv(mappings, signal_status, models)
+        log(f"  Saved to {CSV_OUTPUT_PATH}")
+        flush_log()
+
+        # Step 7: Print summary
+        log("\n[7/7] Summary")
+        flush_log()
+        print_summary(mappings)
+    finally:
+        # Show what a failing step logged before it raised
+        flush_log()
 
 
 if __name__ == "__main__":